@@ -1,14 +1,15 @@
-import json
 import datetime
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from invoke import task
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.join(os.getcwd(), '..'))
 
 from winget_mirror_core import (
-    parse_version_safe, WingetMirrorManager
+    parse_version_safe, WingetMirrorManager, validate_all_hashes, record_validation_results,
+    HASH_ALGORITHMS, json_dumps
 )
 
 # Check Python version
@@ -17,6 +18,12 @@ if sys.version_info < (3, 11):
     print(f"Current version: {sys.version}")
     sys.exit(1)
 
+def print_json(obj):
+    """Write obj to stdout as indented JSON in a single write."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(json_dumps(obj) + b'\n')
+    sys.stdout.flush()
+
 @task
 def init(c, path):
     """Initialize a new mirror usage at the specified path.
@@ -33,24 +40,31 @@ def init(c, path):
     WingetMirrorManager.initialize(path)
 
 @task
-def sync(c, publisher):
+def sync(c, publisher, workers=None):
     """Download the latest version of packages matching the publisher/package filter from the already synced repository.
 
     Downloads the latest version of packages matching the publisher/package filter.
+    Packages are downloaded in parallel using a bounded pool of worker threads.
     The repository must be synced first using 'invoke sync-repo'.
 
     Args:
         publisher: Publisher filter, optionally with package filter (e.g., 'Microsoft' or 'Splunk/ACS').
+        workers: Number of packages to download in parallel (default: 'sync_workers' from invoke config, or 8).
 
     Example:
         invoke sync Microsoft
         invoke sync Splunk/ACS
+        invoke sync Microsoft --workers=4
     """
     manager = WingetMirrorManager()
     if manager.repo is None:
         print("Repository not found. Run 'invoke sync-repo' first.")
         return
 
+    if workers is None:
+        workers = c.config.get('sync_workers', 8)
+    workers = max(1, int(workers))
+
     processed_packages = set()
 
     # Parse publisher/package filter
@@ -62,66 +76,108 @@ def sync(c, publisher):
 
     publishers = manager.get_matching_publishers(pub_filter)
 
-    manifests_dir = manager.mirror_dir / 'manifests'
+    pkg_filter_lower = pkg_filter.lower() if pkg_filter else None
 
+    # (publisher, package name, package_id) tuples, so the id is never re-split
+    packages = []
     for pub in publishers:
-        first_letter = pub[0].lower()
-        publisher_path = manifests_dir / first_letter / pub
-        for package_path in publisher_path.iterdir():
-            if not package_path.is_dir():
-                continue
-
+        for name in manager.list_packages(pub):
             # Filter by package name if specified
-            if pkg_filter and not package_path.name.lower().startswith(pkg_filter.lower()):
+            if pkg_filter_lower and not name.lower().startswith(pkg_filter_lower):
                 continue
 
-            package_id = f'{pub}.{package_path.name}'
-            pkg = manager.get_package(package_id)
-            if pkg.download():
-                processed_packages.add(package_id)
-
-    # Update state
+            packages.append((pub, name, f'{pub}.{name}'))
+
+    # Create the downloads mapping up front so worker threads only touch their own entries
+    manager.state.setdefault('downloads', {})
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(manager.get_package(package_id, pub, name).download): package_id
+            for pub, name, package_id in packages
+        }
+        for future in as_completed(futures):
+            package_id = futures[future]
+            try:
+                if future.result():
+                    processed_packages.add(package_id)
+            except Exception as e:
+                print(f"Error: Failed to download {package_id}: {e}")
+                failed.append(package_id)
+
+    # Update state once all downloads have finished
     manager.state['last_sync'] = datetime.datetime.now().isoformat()
-    manager.save_state()
+    manager.flush_state(force=True)
 
     if publisher:
         print(f"Downloaded {len(processed_packages)} packages matching '{publisher}'")
+    if failed:
+        print(f"Error: {len(failed)} package(s) failed to download")
+        sys.exit(1)
 
 @task
-def refresh_synced(c):
+def refresh_synced(c, workers=None):
     """Refresh all synced packages to their latest versions.
 
     Checks each package in state.json for newer versions in the repository
     and downloads/updates them if available. The repository must be synced first.
+    Version lookups and downloads both run on a bounded pool of worker threads.
+
+    Args:
+        workers: Number of worker threads (default: 'sync_workers' from invoke config, or 8).
 
     Example:
         invoke refresh-synced
+        invoke refresh-synced --workers=4
     """
     manager = WingetMirrorManager()
     if manager.repo is None:
         print("Repository not found. Run 'invoke sync-repo' first.")
         return
 
+    if workers is None:
+        workers = c.config.get('sync_workers', 8)
+    workers = max(1, int(workers))
+
     updated_packages = set()
 
-    for package_id, package_info in manager.state.get('downloads', {}).items():
-        current_version = package_info['version']
+    downloads = manager.state.get('downloads', {})
+    packages = {package_id: manager.get_package(package_id) for package_id in downloads}
 
-        pkg = manager.get_package(package_id)
-        latest_version = pkg.get_latest_version()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Look up all latest versions up front so the manifest directory reads overlap
+        latest_versions = dict(zip(packages, executor.map(lambda pkg: pkg.get_latest_version(), packages.values())))
 
-        if latest_version and parse_version_safe(latest_version) > parse_version_safe(current_version):
-            print(f"Updating {package_id} from {current_version} to {latest_version}")
-            if pkg.download():
-                updated_packages.add(package_id)
-        else:
-            print(f"{package_id} is up to date")
+        futures = {}
+        failed = []
+        for package_id, package_info in list(downloads.items()):
+            current_version = package_info['version']
+            latest_version = latest_versions[package_id]
 
-    # Update state
+            if latest_version and parse_version_safe(latest_version) > parse_version_safe(current_version):
+                print(f"Updating {package_id} from {current_version} to {latest_version}")
+                futures[executor.submit(packages[package_id].download)] = package_id
+            else:
+                print(f"{package_id} is up to date")
+
+        for future in as_completed(futures):
+            package_id = futures[future]
+            try:
+                if future.result():
+                    updated_packages.add(package_id)
+            except Exception as e:
+                print(f"Error: Failed to update {package_id}: {e}")
+                failed.append(package_id)
+
+    # Update state once all downloads have finished
     manager.state['last_sync'] = datetime.datetime.now().isoformat()
-    manager.save_state()
+    manager.flush_state(force=True)
 
     print(f"Refreshed {len(updated_packages)} packages")
+    if failed:
+        print(f"Error: {len(failed)} package(s) failed to update")
+        sys.exit(1)
 
 @task
 def sync_repo(c):
@@ -139,71 +195,114 @@ def sync_repo(c):
     manager.sync_repo()
 
 @task
-def validate_hash(c, output=None):
+def validate_hash(c, output=None, workers=None, algo='sha256', force=False, strict=False):
     """Validate SHA256 hashes of all downloaded files against stored checksums.
 
     Checks that all expected files exist and their hashes match the recorded values.
+    Packages are validated in parallel across worker processes.
+    Files whose size and mtime are unchanged since they were last hashed are
+    reported as CACHED without re-hashing; use --force to re-hash everything.
     Exits with error code 1 if any validation fails.
 
+    With --algo=blake2b or --algo=blake3 (the latter requires the optional 'blake3'
+    package), files are checked against a locally recorded digest instead of
+    SHA256. The first run verifies each file with SHA256 and records its local
+    digest in state.json.
+    Add --strict to re-check SHA256 as well; this also re-hashes files that would
+    otherwise be reported as CACHED.
+
     Args:
         output: Optional output format. Use 'json' for JSON output, otherwise human-readable text.
+        workers: Number of worker processes (default: number of CPUs). With fewer
+            processes than CPUs, the spare CPUs hash files within a package in parallel.
+        algo: Hash algorithm for local validation: 'sha256' (default), 'blake2b' or 'blake3'.
+        force: Re-hash every file even if its size and mtime are unchanged.
+        strict: With a local algo, also verify files against their SHA256 (implies --force).
 
     Examples:
         invoke validate-hash
         invoke validate-hash --output=json
+        invoke validate-hash --algo=blake2b
+        invoke validate-hash --algo=blake3 --strict
+        invoke validate-hash --force
     """
+    if algo not in HASH_ALGORITHMS:
+        print(f"Error: algo must be one of: {', '.join(HASH_ALGORITHMS)}")
+        sys.exit(1)
+
     manager = WingetMirrorManager()
 
     if 'downloads' not in manager.state or not manager.state['downloads']:
         if output == 'json':
-            print(json.dumps({"all_valid": True, "packages": {}}, indent=4))
+            print_json({"all_valid": True, "packages": {}})
         else:
             print("No downloaded packages found in state.json")
         return
 
+    try:
+        packages = validate_all_hashes(manager, int(workers) if workers else None, algo, force, strict)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     results = {
-        "all_valid": True,
-        "packages": {}
+        "all_valid": all(pkg_results["valid"] for pkg_results in packages.values()),
+        "packages": packages
     }
 
-    for package_id in manager.state['downloads']:
-        pkg = manager.get_package(package_id)
-        pkg_results = pkg.validate_hashes()
-        results["packages"][package_id] = pkg_results
-        if not pkg_results["valid"]:
-            results["all_valid"] = False
+    record_validation_results(manager, packages, algo)
+    manager.flush_state()
+
+    # 'stat' and 'local_hash' only carry state.json bookkeeping back from the workers
+    for pkg_results in packages.values():
+        for file_data in pkg_results.get('files', {}).values():
+            file_data.pop('stat', None)
+            file_data.pop('local_hash', None)
 
     if output == 'json':
-        print(json.dumps(results, indent=4))
+        print_json(results)
     else:
-        # Print human-readable output
+        # Build the human-readable report and write it in one call; per-line
+        # print() dominates for mirrors with thousands of files
+        out = []
         for package_id, pkg_data in results["packages"].items():
             if not pkg_data["files"] and not pkg_data["missing_files"]:
-                print(f"Warning: No files recorded for {package_id}")
+                out.append(f"Warning: No files recorded for {package_id}\n")
                 continue
 
             if not pkg_data["valid"] and not pkg_data["files"] and pkg_data["missing_files"]:
                 publisher, package = package_id.split('.', 1)
                 download_dir = manager.downloads_dir / publisher / package / manager.state['downloads'][package_id]['version']
-                print(f"Error: Download directory missing for {package_id}: {download_dir}")
+                out.append(f"Error: Download directory missing for {package_id}: {download_dir}\n")
                 continue
 
             for filename, file_data in pkg_data["files"].items():
-                status = file_data["status"]
-                print(f"Validating {package_id}/{filename}: {status}")
-                print(f"  Tracked hash: {file_data['expected']}")
-                print(f"  Computed hash: {file_data['computed']}")
+                if file_data['status'] == "CACHED":
+                    out.append(
+                        f"Validating {package_id}/{filename}: CACHED (size and mtime unchanged)\n"
+                        f"  Tracked hash: {file_data['expected']}\n"
+                    )
+                    continue
+                out.append(
+                    f"Validating {package_id}/{filename}: {file_data['status']}\n"
+                    f"  Tracked hash: {file_data['expected']}\n"
+                    f"  Computed hash: {file_data['computed']}\n"
+                )
 
             for missing in pkg_data["missing_files"]:
-                print(f"Error: Expected file missing for {package_id}: {missing}")
+                out.append(f"Error: Expected file missing for {package_id}: {missing}\n")
 
             for unexpected in pkg_data["unexpected_files"]:
-                print(f"Warning: Unexpected files in {package_id}: {unexpected}")
+                out.append(f"Warning: Unexpected files in {package_id}: {unexpected}\n")
 
         if results["all_valid"]:
-            print("All downloaded files validated successfully!")
+            out.append("All downloaded files validated successfully!\n")
         else:
-            print("Validation failed! Some files are missing or corrupted.")
+            out.append("Validation failed! Some files are missing or corrupted.\n")
+
+        sys.stdout.write(''.join(out))
+        sys.stdout.flush()
+
+        if not results["all_valid"]:
             sys.exit(1)
 
 @task
@@ -226,10 +325,7 @@ def purge_package(c, publisher):
         return
 
     # Find matching packages
-    matching_packages = [
-        package_id for package_id in manager.state['downloads']
-        if package_id.split('.', 1)[0].lower().startswith(publisher.lower())
-    ]
+    matching_packages = manager.find_downloaded_packages(publisher)
 
     if not matching_packages:
         print(f"No packages found matching publisher '{publisher}'")
@@ -248,11 +344,11 @@ def purge_package(c, publisher):
         return
 
     # Purge
-    purged_count = 0
-    for package_id in matching_packages:
-        pkg = manager.get_package(package_id)
-        if pkg.purge():
-            purged_count += 1
+    try:
+        purged_count = manager.purge_packages(matching_packages)
+    finally:
+        # Keep the packages that were purged out of state even if others failed
+        manager.flush_state()
 
     print(f"Successfully purged {purged_count} package(s)")
 
@@ -287,51 +383,45 @@ def purge_all_packages(c):
         return
 
     # Purge all
-    purged_count = 0
-    for package_id in package_ids:
-        pkg = manager.get_package(package_id)
-        if pkg.purge():
-            purged_count += 1
+    try:
+        purged_count = manager.purge_packages(package_ids)
+    finally:
+        # Keep the packages that were purged out of state even if others failed
+        manager.flush_state()
 
     print(f"Successfully purged {purged_count} package(s)")
 
 @task
-def search(c, publisher):
+def search(c, publisher, verify=False):
     """Search for packages matching the publisher filter.
 
     Lists all packages from the repository matching the publisher filter,
-    along with their download status.
+    along with their download status. The status recorded in state.json is
+    used by default; --verify checks the download directories on disk.
 
     Args:
         publisher: Publisher filter (e.g., 'Microsoft', 'Spotify')
+        verify: Check each downloaded package's files on disk instead of trusting state.json.
 
     Example:
         invoke search Microsoft
+        invoke search Microsoft --verify
     """
     manager = WingetMirrorManager()
     if not manager.mirror_dir.exists():
         print("Repository not found. Run 'invoke sync-repo' first.")
         return
 
-    downloaded_packages = manager.state.get('downloads', {})
-
     # Parse publisher filter
     pub_filter = publisher
 
     publishers = manager.get_matching_publishers(pub_filter)
-    manifests_dir = manager.mirror_dir / 'manifests'
-    first_letter = pub_filter[0].lower()
 
     found_packages = []
 
     for pub in publishers:
-        publisher_path = manifests_dir / first_letter / pub
-        for package_path in publisher_path.iterdir():
-            if not package_path.is_dir():
-                continue
-
-            package_id = f'{pub}.{package_path.name}'
-            found_packages.append(package_id)
+        for name in manager.list_packages(pub):
+            found_packages.append((pub, name, f'{pub}.{name}'))
 
     if not found_packages:
         print(f"No packages found matching publisher '{publisher}'")
@@ -342,45 +432,9 @@ def search(c, publisher):
     max_pkg_len = len("Package")
     max_status_len = len("Status")
 
-    for package_id in sorted(found_packages):
-        pub, pkg = package_id.split('.', 1)
-
-        # Check status
-        if package_id in downloaded_packages:
-            package_info = downloaded_packages[package_id]
-            files = package_info.get('files', {})
-            version = package_info.get('version', 'unknown')
-            timestamp = package_info.get('timestamp', 'unknown')
-            if timestamp != 'unknown' and timestamp != '-':
-                # Format timestamp to be more readable
-                try:
-                    dt = datetime.datetime.fromisoformat(timestamp)
-                    timestamp = dt.strftime('%Y-%m-%d %H:%M')
-                except:
-                    pass
-            if files:
-                # Check if files actually exist
-                download_dir = manager.downloads_dir / pub / pkg / version
-                if download_dir.exists():
-                    actual_files = list(download_dir.glob('*'))
-                    if actual_files:
-                        status = "Downloaded"
-                    else:
-                        status = "Downloaded (empty)"
-                        version = "-"
-                        timestamp = "-"
-                else:
-                    status = "Downloaded (missing)"
-                    version = "-"
-                    timestamp = "-"
-            else:
-                status = "Recorded"
-                version = version
-                timestamp = "-"
-        else:
-            status = "Not downloaded"
-            version = "-"
-            timestamp = "-"
+    for pub, name, package_id in sorted(found_packages, key=lambda found: found[2]):
+        info = manager.get_package(package_id, pub, name).get_status(verify=verify)
+        status, version, timestamp = info['status'], info['version'], info['timestamp']
 
         package_data.append((package_id, status, version, timestamp))
         max_pkg_len = max(max_pkg_len, len(package_id))
@@ -396,7 +450,7 @@ def search(c, publisher):
         print(f"{pkg_id:<{max_pkg_len}}  {status:<{max_status_len}}  {ver:<10}  {ts:<17}")
 
 @task
-def patch_repo(c, server_url, output_dir):
+def patch_repo(c, server_url, output_dir, workers=None):
     """Create patched manifests with corrected InstallerURL paths for downloaded packages.
 
     Copies manifest files for all downloaded packages to the output directory,
@@ -408,6 +462,7 @@ def patch_repo(c, server_url, output_dir):
     Args:
         server_url: Base server URL where downloads will be served (e.g., 'https://mirror.example.com')
         output_dir: Directory to output the patched manifests
+        workers: Number of worker processes (default: number of CPUs).
 
     Example:
         invoke patch-repo --server-url="https://mirror.example.com" --output-dir="./patched-manifests"
@@ -433,6 +488,6 @@ def patch_repo(c, server_url, output_dir):
         print("No downloaded packages found in state.json. Run 'invoke sync' first.")
         return
 
-    manager.patch_repo(server_url, output_dir)
+    manager.patch_repo(server_url, output_dir, int(workers) if workers else None)
     print(f"Patched manifests created in {output_dir}")
 
@@ -0,0 +1,94 @@
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import winget_mirror_core
+from winget_mirror_core import HostLimiter, _fetch_installer
+
+PAYLOAD = bytes(range(256)) * 1000
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class InstallerHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD, answering Range requests according to the server's mode."""
+
+    def do_GET(self):
+        mode = self.server.mode
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if mode == 'error' or (mode == 'range-error' and match):
+            self.send_error(500)
+            return
+        if not match or mode == 'ignore':
+            self.send_body(200, PAYLOAD)
+            return
+        start, end = int(match.group(1)), int(match.group(2))
+        body = PAYLOAD[start:end + 1]
+        if mode == 'short':
+            body = body[:len(body) // 2]
+        self.send_body(206, body, {'Content-Range': f'bytes {start}-{end}/{len(PAYLOAD)}'})
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), InstallerHandler)
+    httpd.mode = 'ranges'
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def ranged_downloads(monkeypatch):
+    # Fetch the test payload as ranges even though it is small
+    monkeypatch.setattr(winget_mirror_core, 'RANGED_DOWNLOAD_THRESHOLD', 1)
+
+
+def fetch(server, tmp_path):
+    installer = {
+        'InstallerUrl': f'http://127.0.0.1:{server.server_port}/tool.exe',
+        'InstallerSha256': PAYLOAD_SHA256.upper(),
+    }
+    package_entry = {'files': {}}
+    with requests.Session() as http:
+        downloaded = _fetch_installer(installer, tmp_path, package_entry, threading.Lock(), http, HostLimiter(4))
+    return downloaded, package_entry
+
+
+@pytest.mark.parametrize('mode', ['ranges', 'ignore', 'short'])
+def test_download_completes(server, tmp_path, mode):
+    server.mode = mode
+
+    downloaded, package_entry = fetch(server, tmp_path)
+
+    assert downloaded
+    assert package_entry['files'] == {'tool.exe': PAYLOAD_SHA256}
+    assert hashlib.sha256((tmp_path / 'tool.exe').read_bytes()).hexdigest() == PAYLOAD_SHA256
+    assert [path.name for path in tmp_path.iterdir()] == ['tool.exe']
+
+
+@pytest.mark.parametrize('mode', ['error', 'range-error'])
+def test_server_errors_leave_no_files(server, tmp_path, mode):
+    server.mode = mode
+
+    with pytest.raises(requests.HTTPError):
+        fetch(server, tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,150 @@
+import textwrap
+
+import pytest
+import yaml
+
+from winget_mirror_core import _quick_installer_fields, _quick_manifest_version
+
+
+def write_manifest(tmp_path, text):
+    path = tmp_path / 'Acme.Tool.installer.yaml'
+    path.write_text(textwrap.dedent(text), encoding='utf-8')
+    return path
+
+
+def installer_fields(path):
+    """The fields _quick_installer_fields() extracts, as PyYAML sees them."""
+    manifest = yaml.safe_load(path.read_text(encoding='utf-8'))
+    return [
+        {key: str(installer[key]) for key in ('InstallerUrl', 'InstallerSha256') if key in installer}
+        for installer in manifest['Installers']
+    ]
+
+
+MATCHING_MANIFESTS = {
+    'plain': """\
+        # Created with WinGet Releaser
+        PackageIdentifier: Acme.Tool
+        PackageVersion: 1.2.0
+        Installers:
+        - Architecture: x64
+          InstallerType: exe
+          InstallerUrl: https://example.com/releases/tool-x64.exe
+          InstallerSha256: D874FD950FF9B48FB40201FDE79C86B7EF7D7F4264C4D9C7D06B42E1714E7D16
+        - Architecture: x86
+          InstallerUrl: https://example.com/releases/tool-x86.msi
+          InstallerSha256: 239BFCBD83DD654ED7BD1A36FADE2522A6524A0297F95464681B950279F19E34
+        ManifestType: installer
+        ManifestVersion: 1.6.0
+        """,
+    'indented list, quotes, comments and nested keys': """\
+        ---
+        PackageIdentifier: Acme.Tool
+        Installers:
+          - Architecture: x64
+            InstallerUrl: "https://example.com/a b.msi"   # quoted
+            InstallerSha256: 'ABCDEF'
+            InstallerSwitches:
+              Silent: /S
+            AppsAndFeaturesEntries:
+            - DisplayName: Tool
+              ProductCode: '{1234}'
+          -
+            Architecture: x86
+            InstallerUrl: https://example.com/x.msi#fragment
+            InstallerSha256: 1234ABCD
+        ManifestType: installer
+        ManifestVersion: '1.6.0'
+        """,
+    'extra spaces after the dash': """\
+        Installers:
+        -   Architecture: arm64
+            InstallerUrl: https://example.com/tool-arm64.zip
+            InstallerSha256: 00FF
+        ManifestType: installer
+        ManifestVersion: 1.9.0
+        """,
+}
+
+
+@pytest.mark.parametrize('text', MATCHING_MANIFESTS.values(), ids=MATCHING_MANIFESTS.keys())
+def test_quick_installer_fields_matches_yaml(tmp_path, text):
+    path = write_manifest(tmp_path, text)
+    assert _quick_installer_fields(path) == installer_fields(path)
+
+
+@pytest.mark.parametrize('text', MATCHING_MANIFESTS.values(), ids=MATCHING_MANIFESTS.keys())
+def test_quick_manifest_version_matches_yaml(tmp_path, text):
+    path = write_manifest(tmp_path, text)
+    assert _quick_manifest_version(path) == yaml.safe_load(path.read_text())['ManifestVersion']
+
+
+FALLBACK_MANIFESTS = {
+    'multi-line plain scalar': """\
+        Installers:
+        - InstallerUrl: https://example.com/very/long/
+            tool.exe
+          InstallerSha256: 00FF
+        ManifestVersion: 1.6.0
+        """,
+    'flow-style installer': """\
+        Installers:
+        - {InstallerUrl: https://example.com/tool.exe, InstallerSha256: 00FF}
+        ManifestVersion: 1.6.0
+        """,
+    'flow-style list': """\
+        Installers: [{InstallerUrl: https://example.com/tool.exe}]
+        ManifestVersion: 1.6.0
+        """,
+    'anchor and alias': """\
+        Installers:
+        - InstallerUrl: &url https://example.com/tool.exe
+        - InstallerUrl: *url
+        ManifestVersion: 1.6.0
+        """,
+    'block scalar': """\
+        Installers:
+        - InstallerUrl: >
+            https://example.com/tool.exe
+        ManifestVersion: 1.6.0
+        """,
+    'unterminated quote': """\
+        Installers:
+        - InstallerUrl: "https://example.com/
+            tool.exe"
+        ManifestVersion: 1.6.0
+        """,
+    'installer without url': """\
+        Installers:
+        - Architecture: x64
+        ManifestVersion: 1.6.0
+        """,
+    'no installers': """\
+        PackageIdentifier: Acme.Tool
+        ManifestVersion: 1.6.0
+        """,
+    'multiple documents': """\
+        Installers:
+        - InstallerUrl: https://example.com/tool.exe
+        ---
+        Installers:
+        - InstallerUrl: https://example.com/other.exe
+        """,
+}
+
+
+@pytest.mark.parametrize('text', FALLBACK_MANIFESTS.values(), ids=FALLBACK_MANIFESTS.keys())
+def test_quick_installer_fields_falls_back(tmp_path, text):
+    assert _quick_installer_fields(write_manifest(tmp_path, text)) is None
+
+
+def test_quick_manifest_version_multi_line_falls_back(tmp_path):
+    path = write_manifest(tmp_path, """\
+        ManifestVersion: 1.6
+          .0
+        """)
+    assert _quick_manifest_version(path) is None
+
+
+def test_quick_manifest_version_missing(tmp_path):
+    assert _quick_manifest_version(write_manifest(tmp_path, "PackageIdentifier: Acme.Tool\n")) is None
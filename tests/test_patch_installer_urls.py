@@ -0,0 +1,111 @@
+import textwrap
+
+import pytest
+import yaml
+
+from winget_mirror_core import _patch_installer_urls
+
+BASE_URL = 'https://mirror.example.com/downloads/Acme/Tool/1.2.0'
+
+
+def manifest_bytes(text):
+    return textwrap.dedent(text).encode()
+
+
+def test_rewrites_every_installer_url_and_keeps_layout():
+    data = manifest_bytes("""\
+        # Created with WinGet Releaser
+        PackageIdentifier: Acme.Tool
+        Installers:
+        - Architecture: x64
+          InstallerUrl: https://example.com/releases/tool-x64.exe  # x64 build
+          InstallerSha256: 00FF
+        - Architecture: x86
+          InstallerUrl: "https://example.com/releases/tool-x86.msi"
+        ManifestType: installer
+        ManifestVersion: 1.6.0
+        """)
+
+    patched, urls = _patch_installer_urls(data, BASE_URL)
+
+    assert urls == [
+        ('https://example.com/releases/tool-x64.exe', f'{BASE_URL}/tool-x64.exe'),
+        ('https://example.com/releases/tool-x86.msi', f'{BASE_URL}/tool-x86.msi'),
+    ]
+    assert patched == data.replace(
+        b'https://example.com/releases/', BASE_URL.encode() + b'/'
+    )
+    installers = yaml.safe_load(patched)['Installers']
+    assert [installer['InstallerUrl'] for installer in installers] == [new for _, new in urls]
+
+
+def test_item_on_its_own_line_and_crlf():
+    data = manifest_bytes("""\
+        Installers:
+        -
+          Architecture: x64
+          InstallerUrl: https://example.com/tool.exe
+        ManifestType: installer
+        """).replace(b'\n', b'\r\n')
+
+    patched, urls = _patch_installer_urls(data, BASE_URL)
+
+    assert urls == [('https://example.com/tool.exe', f'{BASE_URL}/tool.exe')]
+    assert patched == data.replace(b'https://example.com', BASE_URL.encode())
+
+
+def test_single_quotes_are_kept():
+    data = manifest_bytes("""\
+        Installers:
+        - InstallerUrl: 'https://example.com/tool.zip'
+        ManifestType: installer
+        """)
+
+    patched, _ = _patch_installer_urls(data, BASE_URL)
+
+    assert f"InstallerUrl: '{BASE_URL}/tool.zip'".encode() in patched
+
+
+@pytest.mark.parametrize('text', [
+    # Flow-style mapping: the key isn't at the start of a line
+    """\
+    Installers:
+    - {InstallerUrl: https://example.com/tool.exe}
+    ManifestType: installer
+    """,
+    # URL continued on the next line as a multi-line plain scalar
+    """\
+    Installers:
+    - InstallerUrl: https://example.com/very/long/
+        tool.exe
+    ManifestType: installer
+    """,
+    # Quoted URL containing a space
+    """\
+    Installers:
+    - InstallerUrl: "https://example.com/a b.msi"
+    ManifestType: installer
+    """,
+    # Empty value: the next line's key must not be taken for the URL
+    """\
+    Installers:
+    - InstallerUrl:
+      InstallerSha256: 00FF
+    ManifestType: installer
+    """,
+    # '-' alone on its line, then a URL continued on the next line
+    """\
+    Installers:
+    -
+      InstallerUrl: https://example.com/very/long/
+        tool.exe
+    ManifestType: installer
+    """,
+    # No InstallerUrl at all
+    """\
+    PackageIdentifier: Acme.Tool
+    ManifestType: installer
+    """,
+])
+def test_unusual_layouts_fall_back(text):
+    assert _patch_installer_urls(manifest_bytes(text), BASE_URL) == (None, None)
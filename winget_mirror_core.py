@@ -1,14 +1,62 @@
+import os
+import re
 import json
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hashlib
+import mmap
 import datetime
 import shutil
+import functools
+import contextlib
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from git import Repo, RemoteProgress
 from tqdm import tqdm
 from packaging import version
 
+try:
+    # libyaml-backed loader/dumper, much faster than the pure-Python ones
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HASH_ALGORITHMS = ('sha256', 'blake2b', 'blake3')
+
+# SHA256 constructor used by every hashing call site. hashlib's OpenSSL-backed
+# sha256 already uses SHA-NI / ARMv8 crypto instructions when the linked
+# OpenSSL supports them; swap this for a faster binding if yours doesn't.
+_sha256_ctor = hashlib.sha256
+
+# Write buffer for downloads; coalesces small network chunks into few write() calls
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+# Bytes requested per iter_content() step while streaming a download; large
+# chunks keep the per-chunk Python overhead (urllib3, hashing, tqdm) negligible
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Installers at least this large are fetched as parallel byte ranges when the server allows it
+RANGED_DOWNLOAD_THRESHOLD = 16 << 20
+RANGED_DOWNLOAD_PARTS = 8
+
+# Upper bound on threads hashing one package's files in validate_hashes()
+VALIDATE_FILE_WORKERS = 8
+
+# An 'InstallerUrl: <value>' line in a raw installer manifest; the value is checked by _patch_installer_urls()
+INSTALLER_URL_RE = re.compile(rb'^([ \t]*(?:-[ \t]+)?InstallerUrl:[ \t]*)([^\n]*)', re.M)
+
 class GitProgress(RemoteProgress):
     def update(self, op_code, cur_count, max_count=None, message=''):
         if max_count:
@@ -16,6 +64,7 @@ class GitProgress(RemoteProgress):
         else:
             print(f"\r{op_code} {cur_count} {message}", end='', flush=True)
 
+@functools.lru_cache(maxsize=65536)
 def parse_version_safe(v):
     """Parse version string, handling non-PEP 440 versions like '1.2.40.592'."""
     try:
@@ -30,6 +79,299 @@ def parse_version_safe(v):
                 break  # Stop at first non-numeric part
         return tuple(parts) if parts else (0,)
 
+def _preallocate(f, size):
+    """Reserve size bytes for a file about to be written sequentially (no-op where unsupported, e.g. Windows)."""
+    if size and hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except OSError:
+            pass  # Filesystem can't preallocate; blocks are allocated as the file grows
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_SEQUENTIAL)
+
+def _drop_page_cache(path):
+    """Tell the kernel a file won't be read again soon, freeing its page cache.
+
+    Call once after the last read of a file, not after every hash: a second
+    pass over the file would otherwise have to go back to disk.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        with contextlib.suppress(OSError):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+def blake2b_256():
+    """Return a new BLAKE2b hash object with a 32-byte digest, the size used for local hashes."""
+    return hashlib.blake2b(digest_size=32)
+
+def digest_file(path, new_hash=None):
+    """Return the hex digest of a file, hashed with objects created by new_hash.
+
+    The file is memory-mapped so the hash runs straight from the page cache
+    without copying through Python buffers. Files that can't be mapped (empty
+    files, some network filesystems) are streamed in fixed-size chunks instead.
+    new_hash defaults to the module's SHA256 constructor.
+    """
+    new_hash = new_hash or _sha256_ctor
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mm = None
+        if mm is not None:
+            with mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    # Hint the kernel to read ahead aggressively
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                h = new_hash()
+                h.update(mm)
+        elif hasattr(hashlib, 'file_digest'):
+            # Python 3.11+: hashes in C with a fixed internal buffer
+            h = hashlib.file_digest(f, new_hash)
+        else:
+            # Older Pythons: read into one reusable buffer instead of a new bytes per chunk
+            h = new_hash()
+            buf = bytearray(1 << 20)
+            view = memoryview(buf)
+            while size := f.readinto(buf):
+                h.update(view[:size])
+        return h.hexdigest()
+
+def sha256_file(path):
+    """Return the SHA256 hex digest of a file."""
+    return digest_file(path, _sha256_ctor)
+
+def file_stat_record(path):
+    """Return the size/mtime record stored in 'file_stats' for a file whose hash was just verified."""
+    st = os.stat(path)
+    return {
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'validated_at': datetime.datetime.now().isoformat()
+    }
+
+def file_hash(path, algo='sha256'):
+    """Return the hex digest of a file using the given algorithm ('sha256', 'blake2b' or 'blake3')."""
+    if algo == 'sha256':
+        return sha256_file(path)
+    if algo == 'blake2b':
+        return digest_file(path, blake2b_256)
+    if algo == 'blake3':
+        if blake3 is None:
+            raise ValueError("The 'blake3' package is required for --algo=blake3. Install it with 'pip install blake3'.")
+        return blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(str(path)).hexdigest()
+    raise ValueError(f"Unsupported hash algorithm: {algo}")
+
+def json_loads(data):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """Serialize obj to indented JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+def load_manifest(yaml_path, mirror_dir=None, cache_dir=None):
+    """Load a manifest YAML file, going through a JSON cache when cache_dir is given.
+
+    Manifests are immutable for a given checkout, so the parsed dict is kept
+    as JSON under cache_dir (mirroring the path relative to mirror_dir) and
+    reused while it is newer than the YAML file. The cache lives outside the
+    git checkout so it never shows up as untracked files there. Manifests
+    with values JSON can't represent exactly (e.g. dates) are not cached.
+    """
+    yaml_path = Path(yaml_path)
+    cache_path = None
+    if cache_dir is not None and mirror_dir is not None:
+        cache_path = Path(cache_dir) / yaml_path.relative_to(mirror_dir).with_suffix('.json')
+        try:
+            if cache_path.stat().st_mtime_ns >= yaml_path.stat().st_mtime_ns:
+                data = cache_path.read_bytes()
+                return json_loads(data)
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache entry; reparse below
+
+    with open(yaml_path) as f:
+        manifest = yaml.load(f, Loader=YamlLoader)
+
+    if cache_path is not None:
+        try:
+            data = json.dumps(manifest).encode()
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
+        except (TypeError, OSError):
+            pass  # Not JSON-representable or cache not writable; the parsed manifest is still valid
+
+    return manifest
+
+def _quick_scalar(value):
+    """Return a plain or simply quoted one-line YAML scalar, or None if it needs a real parser."""
+    value = value.strip()
+    if value[:1] in ('"', "'"):
+        quote = value[0]
+        end = value.find(quote, 1)
+        if end == -1 or (quote == '"' and '\\' in value[1:end]) or value[end + 1:].strip()[:1] not in ('', '#'):
+            return None
+        return value[1:end]
+    value = value.split(' #', 1)[0].strip()
+    if not value or value[0] in '&*!|>[{@`%':
+        return None  # anchors, aliases, tags, block or flow scalars
+    return value
+
+def _quick_manifest_version(path):
+    """Return the top-level ManifestVersion of a manifest by scanning its lines, or None.
+
+    None means the value wasn't found as a simple scalar and the caller should
+    fall back to a full YAML parse.
+    """
+    with open(path, encoding='utf-8-sig') as f:
+        value = None
+        for line in f:
+            if value is not None:
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                # A more-indented line continues a plain scalar over several lines
+                return None if line[:1] in (' ', '\t') else value
+            if line.startswith('ManifestVersion:'):
+                value = _quick_scalar(line[len('ManifestVersion:'):])
+                if value is None:
+                    return None
+    return value
+
+def _quick_installer_fields(path):
+    """Return [{'InstallerUrl': ..., 'InstallerSha256': ...}, ...] by scanning a manifest's lines.
+
+    Understands the block-style layout winget-pkgs manifests are written in:
+    a top-level 'Installers:' list whose items carry the two keys at the item's
+    own indent. Returns None for anything else (flow style, anchors, multiple
+    documents, tabs, multi-line values, items without a URL) so the caller
+    falls back to a full YAML parse.
+    """
+    with open(path, encoding='utf-8-sig') as f:
+        lines = f.read().splitlines()
+
+    installers = None
+    current = None
+    item_indent = key_indent = None
+    # Indent of the key whose value was just captured; a more-indented line
+    # after it would continue that value as a multi-line plain scalar
+    captured_indent = None
+    seen_content = False
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped == '---' and not seen_content:
+            continue
+        seen_content = True
+        if '\t' in line[:len(line) - len(line.lstrip())] or stripped in ('---', '...') or '<<:' in stripped:
+            return None
+        indent = len(line) - len(line.lstrip(' '))
+        if captured_indent is not None:
+            if indent > captured_indent:
+                return None
+            captured_indent = None
+
+        if installers is None:
+            if indent == 0 and stripped.startswith('Installers:'):
+                if stripped[len('Installers:'):].split(' #', 1)[0].strip():
+                    return None  # flow-style or aliased list
+                installers = []
+            continue
+
+        if stripped.startswith('- ') or stripped == '-':
+            if item_indent is None:
+                item_indent = indent
+            if indent == item_indent:
+                current = {}
+                installers.append(current)
+                rest = stripped[1:].lstrip()
+                key_indent = indent + len(stripped) - len(rest)
+                stripped = rest
+                indent = key_indent
+                if not stripped:
+                    key_indent = None  # keys start on the next line
+                    continue
+        elif indent == 0:
+            break  # next top-level key ends the Installers list
+
+        if current is None:
+            return None
+        if key_indent is None:
+            key_indent = indent
+        if indent != key_indent:
+            continue  # nested under another installer key
+        for key in ('InstallerUrl', 'InstallerSha256'):
+            if stripped.startswith(key + ':'):
+                value = _quick_scalar(stripped[len(key) + 1:])
+                if value is None:
+                    return None
+                current[key] = value
+                captured_indent = key_indent
+
+    if not installers or any('InstallerUrl' not in installer for installer in installers):
+        return None
+    return installers
+
+def read_json(path):
+    """Parse config.json or state.json into a fresh dict that the caller may mutate."""
+    return json_loads(Path(path).read_bytes())
+
+def write_state(state_path, state):
+    """Atomically write state.json via a temporary file and os.replace()."""
+    state_path = Path(state_path).resolve()
+    tmp_path = state_path.with_name(state_path.name + '.tmp')
+    tmp_path.write_bytes(json_dumps(state))
+    os.replace(tmp_path, state_path)
+
+def read_hash_cache(path):
+    """Return a downloads directory's sidecar hash record, or {} if it is missing or unreadable.
+
+    The record maps file names to {'size', 'mtime_ns', 'sha256'}.
+    """
+    try:
+        return read_json(path)
+    except (OSError, ValueError):
+        return {}
+
+def record_hash(hash_cache, hash_cache_path, filename, stat_record, sha256):
+    """Add a file's SHA256 to hash_cache and write it to hash_cache_path right away.
+
+    Writing after every hash, rather than with state.json at the end of a sync,
+    means a sync that is interrupted doesn't have to re-hash the files it
+    already has the next time. Callers on a thread pool must serialize calls
+    for the same hash_cache.
+    """
+    hash_cache[filename] = {'size': stat_record['size'], 'mtime_ns': stat_record['mtime_ns'], 'sha256': sha256}
+    if hash_cache_path is None:
+        return
+    try:
+        hash_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_state(hash_cache_path, hash_cache)
+    except OSError:
+        pass  # Cache not writable; the hash is still recorded in state
+
+def find_latest_version(package_path):
+    """Return the highest version directory name under package_path, or None if there is none.
+
+    Each name is parsed once; names with no numeric component at all (parsed
+    as (0,)) are not considered versions.
+    """
+    with os.scandir(package_path) as entries:
+        parsed = [(parse_version_safe(e.name), e.name) for e in entries if e.is_dir(follow_symlinks=False)]
+    parsed = [p for p in parsed if p[0] != (0,)]
+    if not parsed:
+        return None
+    return max(parsed, key=lambda p: p[0])[1]
+
 def load_config_and_state():
     """Load and return config and state from files, or None if not found."""
     config_path = Path('config.json')
@@ -43,30 +385,226 @@ def load_config_and_state():
         print("state.json not found. Run 'invoke init --path=<path>' first.")
         return None, None
 
-    with open(config_path) as f:
-        config = json.load(f)
+    config = read_json(config_path)
 
-    with open(state_path) as f:
-        state = json.load(f)
+    state = read_json(state_path)
 
     return config, state
 
-def get_matching_publishers(mirror_dir, publisher):
-    """Return list of publishers matching the filter string."""
-    first_letter = publisher[0].lower()
-    manifests_dir = Path(mirror_dir) / 'manifests'
-    matching = []
-    publisher_dir = manifests_dir / first_letter
-
-    if publisher_dir.exists():
-        for pub in publisher_dir.iterdir():
-            if pub.is_dir() and pub.name.lower().startswith(publisher.lower()):
-                matching.append(pub.name)
+def create_session():
+    """Create a requests session with a pooled, retrying HTTP adapter.
+
+    Installer URLs cluster on a handful of hosts, so reusing connections across
+    downloads avoids a new TCP/TLS handshake per file. The session is shared by
+    the download worker threads.
+    """
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class HostLimiter:
+    """Bound the number of concurrent downloads per host.
+
+    Parallel syncs send many requests to the same CDN; each host gets its own
+    semaphore so one host can't take every worker slot.
+    """
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def slot(self, url):
+        """Return the semaphore guarding downloads from the host of url."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+class RangeNotHonoured(Exception):
+    """A server advertised byte ranges but didn't return the requested range."""
+
+def _host_slot(host_limiter, url):
+    return host_limiter.slot(url) if host_limiter else contextlib.nullcontext()
+
+def _download_range(http, url, filepath, start, end, bar, host_limiter=None):
+    """Fetch bytes start..end (inclusive) of url into the same offsets of filepath.
+
+    Each range is one connection, so it holds its own host_limiter slot.
+
+    Raises:
+        RangeNotHonoured: The server answered with anything but exactly the requested range.
+    """
+    with _host_slot(host_limiter, url), http.get(url, headers={'Range': f'bytes={start}-{end}'}, stream=True) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise RangeNotHonoured(f"Server ignored Range request for {url}")
+        content_range = response.headers.get('content-range', '')
+        if not content_range.startswith(f'bytes {start}-{end}/'):
+            raise RangeNotHonoured(f"Server returned range '{content_range}' for bytes {start}-{end} of {url}")
+        written = 0
+        with open(filepath, 'r+b', buffering=DOWNLOAD_BUFFER_SIZE) as f:
+            f.seek(start)
+            for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                size = f.write(data)
+                written += size
+                bar.update(size)
+        if written != end - start + 1:
+            raise RangeNotHonoured(f"Got {written} of {end - start + 1} bytes for range {start}-{end} of {url}")
+
+def _download_ranged(http, url, filepath, total_size, parts=RANGED_DOWNLOAD_PARTS, host_limiter=None):
+    """Download url as `parts` concurrent byte ranges written into a preallocated file."""
+    with open(filepath, 'wb') as f:
+        f.truncate(total_size)
+        _preallocate(f, total_size)
+
+    part_size = -(-total_size // parts)
+    ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+
+    with tqdm(
+        desc=filepath.name,
+        total=total_size,
+        unit='iB',
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as bar, ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_download_range, http, url, filepath, start, end, bar, host_limiter) for start, end in ranges]
+        for future in as_completed(futures):
+            future.result()
+
+def _download_stream(response, filepath, total_size):
+    """Write a streamed response body to filepath, returning its SHA256 hex digest.
+
+    Hashes while streaming so each byte is read once instead of re-reading the file.
+    """
+    h = _sha256_ctor()
+    with open(filepath, 'wb', buffering=DOWNLOAD_BUFFER_SIZE) as f, tqdm(
+        desc=filepath.name,
+        total=total_size,
+        unit='iB',
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as bar:
+        _preallocate(f, total_size)
+        for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            h.update(data)
+            size = f.write(data)
+            bar.update(size)
+        # Content-Length can differ from the decoded body; drop any unused preallocation
+        f.truncate(f.tell())
+    return h.hexdigest()
+
+def _fetch_installer(installer, download_dir, package_entry, lock, http, host_limiter, hash_cache=None, hash_cache_path=None):
+    """Download one installer into download_dir and record its hash in package_entry.
+
+    Runs on process_package's thread pool; updates to package_entry and
+    hash_cache are made under lock. The download goes to '<filename>.part',
+    which is only renamed into place once complete, so an interrupted or failed
+    download is never mistaken for an existing file on the next sync.
+
+    Every hash computed is also stored through record_hash(), so an existing
+    file missing from package_entry is only re-hashed if its size or mtime
+    changed since.
+
+    Returns:
+        bool: True if the file was downloaded, False if it already existed.
+    """
+    url = installer['InstallerUrl']
+    sha256 = installer.get('InstallerSha256')
+    filename = Path(url).name
+    filepath = download_dir / filename
+
+    if filepath.exists():
+        # File already exists, add to files if not already
+        with lock:
+            known = filename in package_entry['files']
+        if not known:
+            stat_record = file_stat_record(filepath)
+            with lock:
+                cached = (hash_cache or {}).get(filename)
+            if cached and cached['size'] == stat_record['size'] and cached['mtime_ns'] == stat_record['mtime_ns']:
+                computed_hash = cached['sha256']
+            else:
+                computed_hash = sha256_file(filepath)
+                _drop_page_cache(filepath)
+                # Stat again in case the file changed while it was being hashed
+                stat_record = file_stat_record(filepath)
+                if hash_cache is not None:
+                    with lock:
+                        record_hash(hash_cache, hash_cache_path, filename, stat_record, computed_hash)
+            with lock:
+                package_entry['files'][filename] = computed_hash
+                package_entry.setdefault('file_stats', {})[filename] = stat_record
+        return False
 
-    return matching
+    part_path = filepath.with_name(filename + '.part')
+    # Every connection counts against the host's limit, so split into at most that many ranges
+    parts = min(RANGED_DOWNLOAD_PARTS, host_limiter.per_host) if host_limiter else RANGED_DOWNLOAD_PARTS
+    try:
+        computed_hash = None
+        with _host_slot(host_limiter, url):
+            print(f"Downloading {url} to {filepath}")
+            response = http.get(url, stream=True)
+            response.raise_for_status()
+            total_size = int(response.headers.get('content-length', 0))
+            ranged = (
+                parts > 1
+                and total_size >= RANGED_DOWNLOAD_THRESHOLD
+                and response.headers.get('accept-ranges', '').lower() == 'bytes'
+            )
+            if ranged:
+                # Large file on a server that supports ranges: drop this stream
+                # and its slot, then fetch the (post-redirect) URL as ranges
+                response.close()
+            else:
+                computed_hash = _download_stream(response, part_path, total_size)
 
-def process_package(package_id, mirror_dir, downloads_dir, downloaded, repo):
-    """Process a single package: find latest version, download if needed, update state."""
+        if computed_hash is None:
+            try:
+                _download_ranged(http, response.url, part_path, total_size, parts, host_limiter)
+                computed_hash = sha256_file(part_path)
+                _drop_page_cache(part_path)
+            except RangeNotHonoured as e:
+                print(f"Warning: {e}; downloading {filename} as a single stream instead")
+                with _host_slot(host_limiter, url):
+                    response = http.get(response.url, stream=True)
+                    response.raise_for_status()
+                    computed_hash = _download_stream(response, part_path, int(response.headers.get('content-length', 0)))
+
+        os.replace(part_path, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            part_path.unlink()
+        raise
+
+    # Validate hash
+    if sha256 and computed_hash != sha256.lower():
+        print(f"Warning: Hash mismatch for {filepath}, expected {sha256}, got {computed_hash}")
+        # Still add the file to allow the mirror to work
+
+    stat_record = file_stat_record(filepath)
+    with lock:
+        if hash_cache is not None:
+            record_hash(hash_cache, hash_cache_path, filename, stat_record, computed_hash)
+        package_entry['files'][filename] = computed_hash
+        package_entry.setdefault('file_stats', {})[filename] = stat_record
+    return True
+
+def process_package(package_id, mirror_dir, downloads_dir, downloaded, repo, session=None, host_limiter=None, workers=8,
+                    manifest_cache_dir=None, latest_version=None, hash_cache_dir=None):
+    """Process a single package: find latest version, download if needed, update state.
+
+    The package's installers are downloaded in parallel on up to `workers` threads.
+    Pass latest_version when the caller already knows it to skip listing the
+    package's version directories. With hash_cache_dir, the SHA256 of every
+    file is also kept in hash_cache_dir/<pub>/<pkg>/<version>.json (see
+    record_hash()), so existing files are not re-hashed after a restart.
+    """
+    http = session or requests
     try:
         pub, pkg = package_id.split('.', 1)
     except ValueError:
@@ -82,42 +620,40 @@ def process_package(package_id, mirror_dir, downloads_dir, downloaded, repo):
         print(f"Warning: Package directory not found for {package_id}")
         return False
 
-    versions = [p.name for p in package_path.iterdir() if p.is_dir()]
-    if not versions:
+    if latest_version is None:
+        latest_version = find_latest_version(package_path)
+    if latest_version is None:
         return False
 
-    # Filter out invalid version strings
-    valid_versions = []
-    for v in versions:
-        try:
-            parse_version_safe(v)
-            valid_versions.append(v)
-        except:
-            continue
-
-    if not valid_versions:
-        return False
-
-    latest_version = max(valid_versions, key=parse_version_safe)
     yaml_path = package_path / latest_version / f'{pub}.{pkg}.yaml'
     if not yaml_path.exists():
         return False
 
-    with open(yaml_path) as f:
-        manifest = yaml.safe_load(f)
+    # Only ManifestVersion and the installers' URL/SHA256 are needed; scan for
+    # them and parse the full YAML only when the scan can't tell
+    manifest = None
+    manifest_version = _quick_manifest_version(yaml_path)
+    if manifest_version is None:
+        manifest = load_manifest(yaml_path, mirror_dir, manifest_cache_dir)
+        manifest_version = manifest.get('ManifestVersion')
 
-    if 'ManifestVersion' not in manifest or version.parse(manifest['ManifestVersion']) < version.parse('1.0.0'):
-        print(f"Skipping {pkg} due to unsupported ManifestVersion {manifest.get('ManifestVersion')}")
+    if manifest_version is None or version.parse(str(manifest_version)) < version.parse('1.0.0'):
+        print(f"Skipping {pkg} due to unsupported ManifestVersion {manifest_version}")
         return False
 
     # Load installers from separate file if it exists (for split manifests)
     installer_yaml_path = package_path / latest_version / f'{pub}.{pkg}.installer.yaml'
     if installer_yaml_path.exists():
-        with open(installer_yaml_path) as f:
-            installer_manifest = yaml.safe_load(f)
-        installers = installer_manifest.get('Installers', [])
+        installers = _quick_installer_fields(installer_yaml_path)
+        if installers is None:
+            installer_manifest = load_manifest(installer_yaml_path, mirror_dir, manifest_cache_dir)
+            installers = installer_manifest.get('Installers', [])
     else:
-        installers = manifest.get('Installers', [])
+        installers = _quick_installer_fields(yaml_path) if manifest is None else None
+        if installers is None:
+            if manifest is None:
+                manifest = load_manifest(yaml_path, mirror_dir, manifest_cache_dir)
+            installers = manifest.get('Installers', [])
 
     download_dir = downloads_dir / pub / pkg / latest_version
     download_dir.mkdir(parents=True, exist_ok=True)
@@ -131,52 +667,34 @@ def process_package(package_id, mirror_dir, downloads_dir, downloaded, repo):
             'timestamp': None
         }
 
-    downloaded_new = False
-
-    for installer in installers:
-        url = installer['InstallerUrl']
-        sha256 = installer.get('InstallerSha256')
-        filename = Path(url).name
-        filepath = download_dir / filename
-
-        if filepath.exists():
-            # File already exists, add to files if not already
-            if filename not in downloaded[package_id]['files']:
-                with open(filepath, 'rb') as f:
-                    computed_hash = hashlib.sha256(f.read()).hexdigest()
-                downloaded[package_id]['files'][filename] = computed_hash
-            continue
-
-        downloaded_new = True
-        print(f"Downloading {url} to {filepath}")
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        total_size = int(response.headers.get('content-length', 0))
-
-        with open(filepath, 'wb') as f, tqdm(
-            desc=filename,
-            total=total_size,
-            unit='iB',
-            unit_scale=True,
-            unit_divisor=1024,
-        ) as bar:
-            for data in response.iter_content(chunk_size=1024):
-                size = f.write(data)
-                bar.update(size)
+    package_entry = downloaded[package_id]
+    lock = threading.Lock()
 
-        # Validate hash
-        with open(filepath, 'rb') as f:
-            computed_hash = hashlib.sha256(f.read()).hexdigest()
+    hash_cache_path = None
+    if hash_cache_dir is not None:
+        hash_cache_path = Path(hash_cache_dir) / pub / pkg / f'{latest_version}.json'
+    hash_cache = read_hash_cache(hash_cache_path) if hash_cache_path is not None else {}
 
-        if sha256 and computed_hash != sha256.lower():
-            print(f"Warning: Hash mismatch for {filepath}, expected {sha256}, got {computed_hash}")
-            # Still add the file to allow the mirror to work
+    # Installers sharing a file name would write the same path; only fetch the first
+    unique_installers = {}
+    for installer in installers:
+        unique_installers.setdefault(Path(installer['InstallerUrl']).name, installer)
 
-        downloaded[package_id]['files'][filename] = computed_hash
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(_fetch_installer, installer, download_dir, package_entry, lock, http, host_limiter, hash_cache, hash_cache_path)
+            for installer in unique_installers.values()
+        ]
+        downloaded_new = any([future.result() for future in as_completed(futures)])
 
     # Set timestamp after processing all installers
-    if downloaded[package_id]['files']:
-        downloaded[package_id]['timestamp'] = datetime.datetime.now().isoformat()
+    if package_entry['files']:
+        now = datetime.datetime.now()
+        package_entry['timestamp'] = now.isoformat()
+        package_entry['timestamp_display'] = now.strftime('%Y-%m-%d %H:%M')
+        # Recorded so 'search' can report status without listing the download directory
+        package_entry['file_count'] = len(package_entry['files'])
+        package_entry['status'] = "Downloaded"
         if not downloaded_new:
             print(f"Package {package_id} is already up to date")
         return True
@@ -187,7 +705,10 @@ class WingetMirrorManager:
         "repo_url": "https://github.com/microsoft/winget-pkgs",
         "revision": "master",
         "mirror_dir": "mirror",
-        "server_url": None
+        "server_url": None,
+        "max_downloads_per_host": 4,
+        "parallel_downloads": 8,
+        "clone_depth": 1
     }
 
     def __init__(self, config_path='config.json', state_path='state.json'):
@@ -200,16 +721,30 @@ class WingetMirrorManager:
         if not self.state_path.exists():
             raise ValueError(f"State file not found: {self.state_path}")
 
-        with open(self.config_path) as f:
-            self.config = json.load(f)
+        self.config = read_json(self.config_path)
 
-        with open(self.state_path) as f:
-            self.state = json.load(f)
+        self.state = read_json(self.state_path)
 
         self.path = Path(self.state['path'])
         self.mirror_dir = self.path / self.config['mirror_dir']
         self.downloads_dir = self.path / 'downloads'
+        self.manifest_cache_dir = self.path / '.cache'
+        # Sidecar SHA256 records of downloaded files, written as each file is hashed
+        self.hash_cache_dir = self.manifest_cache_dir / 'hashes'
         self.repo = Repo(self.mirror_dir) if self.mirror_dir.exists() else None
+        self.session = create_session()
+        self.host_limiter = HostLimiter(self.config.get('max_downloads_per_host', self.DEFAULT_CONFIG['max_downloads_per_host']))
+        # Lazily built index of the manifests tree, cleared by sync_repo():
+        # first letter -> publisher directory names
+        self._pub_cache = {}
+        # publisher -> package directory names
+        self._pkg_cache = {}
+        # (publisher, package) -> latest version directory name, or None
+        self._latest_cache = {}
+        # lower-case publisher -> downloaded package ids, rebuilt lazily after download/purge
+        self._publisher_index = None
+        # Set by anything that mutates self.state; flush_state() only writes when it is set
+        self._dirty = False
 
     @classmethod
     def initialize(cls, path):
@@ -243,11 +778,8 @@ class WingetMirrorManager:
             "last_sync": None
         }
 
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
-
-        with open(state_path, 'w') as f:
-            json.dump(state, f, indent=4)
+        config_path.write_bytes(json_dumps(config))
+        write_state(state_path, state)
 
         print(f"Initialized mirror at {project_path}")
         print(f"Config: {config_path}")
@@ -263,18 +795,148 @@ class WingetMirrorManager:
         }
 
     def save_state(self):
-        with open(self.path / 'state.json', 'w') as f:
-            json.dump(self.state, f, indent=4)
+        """Write state.json if anything marked it dirty since the last write."""
+        return self.flush_state()
+
+    def mark_dirty(self):
+        """Record that self.state changed, so the next flush_state() writes it.
+
+        Also drops the publisher index find_downloaded_packages() built from
+        state['downloads'], since the change may have added or removed packages.
+        """
+        self._dirty = True
+        self._publisher_index = None
+
+    def flush_state(self, force=False):
+        """Write state.json once for a batch of changes.
+
+        Mutators only call mark_dirty(); callers flush after their loop so a bulk
+        sync or purge rewrites state.json once instead of once per package.
+        The write goes through write_state() and is atomic.
+
+        Args:
+            force: Write even if nothing marked the state dirty.
+
+        Returns:
+            bool: True if state.json was written.
+        """
+        if not (self._dirty or force):
+            return False
+        write_state(self.path / 'state.json', self.state)
+        self._dirty = False
+        return True
+
+    def list_publishers(self, first_letter):
+        """Return the publisher directory names under manifests/<first_letter>, cached per letter."""
+        first_letter = first_letter.lower()
+        if first_letter not in self._pub_cache:
+            publisher_dir = self.mirror_dir / 'manifests' / first_letter
+            if publisher_dir.exists():
+                with os.scandir(publisher_dir) as entries:
+                    self._pub_cache[first_letter] = [e.name for e in entries if e.is_dir(follow_symlinks=False)]
+            else:
+                self._pub_cache[first_letter] = []
+        return self._pub_cache[first_letter]
 
     def get_matching_publishers(self, publisher):
-        return get_matching_publishers(str(self.mirror_dir), publisher)
+        publisher_lower = publisher.lower()
+        return [pub for pub in self.list_publishers(publisher[0]) if pub.lower().startswith(publisher_lower)]
+
+    def list_packages(self, pub):
+        """Return the package directory names under a publisher's manifests, cached per publisher."""
+        if pub not in self._pkg_cache:
+            publisher_path = self.mirror_dir / 'manifests' / pub[0].lower() / pub
+            if publisher_path.is_dir():
+                with os.scandir(publisher_path) as entries:
+                    self._pkg_cache[pub] = [e.name for e in entries if e.is_dir(follow_symlinks=False)]
+            else:
+                self._pkg_cache[pub] = []
+        return self._pkg_cache[pub]
+
+    def latest_version(self, pub, pkg):
+        """Return the latest version of a package in the repository, cached until the next sync_repo()."""
+        key = (pub, pkg)
+        if key not in self._latest_cache:
+            package_path = self.mirror_dir / 'manifests' / pub[0].lower() / pub / pkg
+            self._latest_cache[key] = find_latest_version(package_path) if package_path.is_dir() else None
+        return self._latest_cache[key]
+
+    def clear_manifest_index(self):
+        """Forget the cached manifests tree listings, e.g. after the checkout changed."""
+        self._pub_cache.clear()
+        self._pkg_cache.clear()
+        self._latest_cache.clear()
+
+    def find_downloaded_packages(self, publisher):
+        """Return ids of downloaded packages whose publisher starts with the given filter (case-insensitive)."""
+        if self._publisher_index is None:
+            index = {}
+            for package_id in self.state.get('downloads', {}):
+                index.setdefault(package_id.split('.', 1)[0].lower(), []).append(package_id)
+            self._publisher_index = index
+
+        publisher_lower = publisher.lower()
+        return [
+            package_id
+            for pub, package_ids in self._publisher_index.items() if pub.startswith(publisher_lower)
+            for package_id in package_ids
+        ]
+
+    def purge_packages(self, package_ids, workers=None):
+        """Purge several packages, removing their files in parallel.
+
+        File removal runs on a thread pool (unlink releases the GIL); the state
+        entries of the packages whose files were removed are then dropped in one
+        pass and the state is marked dirty; call flush_state() afterwards to
+        write it, also when this raises.
+
+        Returns:
+            int: Number of packages purged.
+
+        Raises:
+            RuntimeError: If removing any package's files failed. The other
+                packages are still purged and dropped from state first.
+        """
+        downloads = self.state.get('downloads', {})
+        packages = [self.get_package(package_id) for package_id in package_ids if package_id in downloads]
+        if not packages:
+            return 0
+
+        purged = []
+        failed = {}
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = {executor.submit(pkg.remove_files): pkg for pkg in packages}
+            for future in as_completed(futures):
+                pkg = futures[future]
+                try:
+                    if future.result():
+                        purged.append(pkg)
+                except Exception as e:
+                    failed[pkg.package_id] = e
+
+        for pkg in purged:
+            del downloads[pkg.package_id]
+        if purged:
+            self.mark_dirty()
+
+        if failed:
+            for package_id, e in failed.items():
+                print(f"Error: Failed to purge {package_id}: {e}")
+            raise RuntimeError(f"Failed to purge {len(failed)} package(s)") from next(iter(failed.values()))
+        return len(purged)
 
-    def get_package(self, package_id):
-        return WingetPackage(self, package_id)
+    def get_package(self, package_id, pub=None, pkg=None):
+        return WingetPackage(self, package_id, pub, pkg)
 
     def sync_repo(self):
-        """Sync the winget-pkgs git repository to the configured revision."""
+        """Sync the winget-pkgs git repository to the configured revision.
+
+        Clones and fetches are shallow ('clone_depth' commits, default 1) and
+        blobless. Set 'clone_depth' to null in config.json to fetch full
+        history, e.g. when 'revision' is a commit SHA rather than a branch or tag.
+        """
         repo_path = self.mirror_dir
+        depth = self.config.get('clone_depth', self.DEFAULT_CONFIG['clone_depth'])
         if repo_path.exists():
             print("Updating repository...")
             repo = Repo(repo_path)
@@ -292,12 +954,22 @@ class WingetMirrorManager:
                 # Re-checkout to apply sparse checkout
                 repo.git.checkout(self.config['revision'])
             else:
-                repo.remotes.origin.fetch(progress=GitProgress())
+                if depth:
+                    # Only fetch the tip; blobs outside the sparse paths are never downloaded
+                    repo.git.fetch(f'--depth={depth}', '--filter=blob:none', 'origin', self.config['revision'])
+                else:
+                    repo.remotes.origin.fetch(progress=GitProgress())
                 repo.git.checkout(self.config['revision'])
         else:
             print("Warning: Initial clone may take several minutes depending on your internet connection.")
             print("Cloning repository with sparse checkout...")
-            repo = Repo.clone_from(self.config['repo_url'], repo_path, no_checkout=True, progress=GitProgress())
+            clone_options = []
+            if depth:
+                # Shallow, blobless clone of just the configured branch/tag: the full
+                # winget-pkgs history is several GB and only the tip is ever checked out
+                clone_options = [f'--depth={depth}', '--filter=blob:none', f"--branch={self.config['revision']}"]
+            repo = Repo.clone_from(self.config['repo_url'], repo_path, no_checkout=True, progress=GitProgress(),
+                                   multi_options=clone_options)
             # Set up sparse checkout
             repo.git.config('core.sparseCheckout', 'true')
             sparse_checkout_file = repo_path / '.git' / 'info' / 'sparse-checkout'
@@ -309,9 +981,10 @@ class WingetMirrorManager:
 
         print(f"Synced repo to {self.config['revision']} at {repo_path}")
         self.repo = repo
+        self.clear_manifest_index()
         return repo
 
-    def patch_repo(self, server_url, output_dir):
+    def patch_repo(self, server_url, output_dir, workers=None):
         """Create patched manifests with corrected InstallerURL paths for downloaded packages.
 
         Copies manifest files for all downloaded packages to the output directory,
@@ -321,6 +994,7 @@ class WingetMirrorManager:
         Args:
             server_url: Base server URL where downloads will be served (e.g., 'https://mirror.example.com')
             output_dir: Directory to output the patched manifests
+            workers: Number of worker processes (default: number of CPUs)
 
         Returns:
             int: Number of packages patched
@@ -332,8 +1006,7 @@ class WingetMirrorManager:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        patched_count = 0
-
+        jobs = []
         for package_id, package_info in self.state['downloads'].items():
             pub, pkg = package_id.split('.', 1)
             version = package_info['version']
@@ -348,79 +1021,242 @@ class WingetMirrorManager:
 
             # Target manifest directory
             target_manifest_dir = output_path / 'manifests' / first_letter / pub / pkg / version
-            target_manifest_dir.mkdir(parents=True, exist_ok=True)
-
-            # Copy and patch manifest files
-            for manifest_file in source_manifest_dir.glob('*.yaml'):
-                target_file = target_manifest_dir / manifest_file.name
+            jobs.append((package_id, version, source_manifest_dir, target_manifest_dir))
 
-                with open(manifest_file) as f:
-                    manifest = yaml.safe_load(f)
+        # Packages are independent, so patch them in worker processes; messages
+        # are returned and printed here in state order
+        patched_count = 0
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [
+                executor.submit(_patch_one_package, package_id, version, source_dir, target_dir, server_url,
+                                self.mirror_dir, self.manifest_cache_dir)
+                for package_id, version, source_dir, target_dir in jobs
+            ]
+            for future in futures:
+                patched, messages = future.result()
+                for message in messages:
+                    print(message)
+                patched_count += patched
 
-                # Patch installer URLs if this is an installer manifest
-                if manifest.get('ManifestType') == 'installer' and 'Installers' in manifest:
-                    for installer in manifest['Installers']:
-                        if 'InstallerUrl' in installer:
-                            original_url = installer['InstallerUrl']
-                            filename = Path(original_url).name
-                            # Construct new URL: server_url + /downloads/pub/pkg/version/filename
-                            new_url = f"{server_url.rstrip('/')}/downloads/{pub}/{pkg}/{version}/{filename}"
-                            installer['InstallerUrl'] = new_url
-                            print(f"Patched {package_id}: {original_url} -> {new_url}")
+        print(f"Successfully patched {patched_count} packages")
+        return patched_count
 
-                # Write patched manifest
-                with open(target_file, 'w') as f:
-                    yaml.dump(manifest, f, default_flow_style=False, sort_keys=False)
+def _patch_installer_urls(data, base_url):
+    """Rewrite every InstallerUrl in a raw installer manifest to base_url/<filename>.
+
+    Works on the manifest bytes so comments, quoting and key order are kept and
+    no YAML parse or dump is needed.
+
+    Returns:
+        tuple: (patched bytes, list of (original_url, new_url)), or (None, None)
+        if not every InstallerUrl key could be matched and the caller should
+        fall back to a full YAML round-trip.
+    """
+    for m in INSTALLER_URL_RE.finditer(data):
+        # A more-indented line after the URL continues it as a multi-line scalar
+        key_column = m.group(1).index(b'InstallerUrl')
+        pos = data.find(b'\n', m.end())
+        while pos != -1:
+            end = data.find(b'\n', pos + 1)
+            line = data[pos + 1:end] if end != -1 else data[pos + 1:]
+            stripped = line.strip()
+            if stripped and not stripped.startswith(b'#'):
+                if len(line) - len(line.lstrip()) > key_column:
+                    return None, None
+                break
+            pos = end
+
+    patched = []
+    unsupported = []
+
+    def rewrite(m):
+        rest = m.group(2).decode()
+        url = _quick_scalar(rest)
+        if not url or any(c.isspace() for c in url):
+            # Empty, multi-line or otherwise unusual value: leave it to the YAML path
+            unsupported.append(m.group(0))
+            return m.group(0)
+        quote = rest[0] if rest[0] in ('"', "'") else ''
+        if quote:
+            value = rest[:rest.index(quote, 1) + 1]
+        else:
+            value = rest.split(' #', 1)[0].rstrip()
+        new_url = f"{base_url}/{Path(url).name}"
+        patched.append((url, new_url))
+        return m.group(1) + f"{quote}{new_url}{quote}".encode() + rest[len(value):].encode()
 
-            patched_count += 1
-            print(f"Patched manifests for {package_id}")
+    data, count = INSTALLER_URL_RE.subn(rewrite, data)
+    if unsupported or count == 0 or count != data.count(b'InstallerUrl:'):
+        return None, None
+    return data, patched
+
+def _patch_one_package(package_id, version, source_dir, target_dir, server_url, mirror_dir=None, cache_dir=None):
+    """Write patched copies of one package's manifests from source_dir into target_dir.
+
+    Lives at module level so patch_repo() can run it in a ProcessPoolExecutor.
+    Progress messages are returned rather than printed so that the main
+    process can emit them in order.
+
+    Returns:
+        tuple: (number of packages patched (0 or 1), list of messages)
+    """
+    messages = []
+    pub, pkg = package_id.split('.', 1)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    base_url = f"{server_url.rstrip('/')}/downloads/{pub}/{pkg}/{version}"
+
+    # Copy and patch manifest files
+    for manifest_file in source_dir.glob('*.yaml'):
+        target_file = target_dir / manifest_file.name
+
+        data = manifest_file.read_bytes()
+        if b'InstallerUrl' not in data:
+            # Nothing to patch (version, locale manifests): copy as-is
+            target_file.write_bytes(data)
+            continue
+        if b'ManifestType: installer' in data:
+            patched_data, patched = _patch_installer_urls(data, base_url)
+            if patched_data is not None:
+                for original_url, new_url in patched:
+                    messages.append(f"Patched {package_id}: {original_url} -> {new_url}")
+                target_file.write_bytes(patched_data)
+                continue
 
-        print(f"Successfully patched {patched_count} packages")
-        return patched_count
+        # Unusual layout: fall back to a full parse and dump
+        manifest = load_manifest(manifest_file, mirror_dir, cache_dir)
+
+        # Patch installer URLs if this is an installer manifest
+        if manifest.get('ManifestType') == 'installer' and 'Installers' in manifest:
+            for installer in manifest['Installers']:
+                if 'InstallerUrl' in installer:
+                    original_url = installer['InstallerUrl']
+                    filename = Path(original_url).name
+                    # Construct new URL: server_url + /downloads/pub/pkg/version/filename
+                    new_url = f"{base_url}/{filename}"
+                    installer['InstallerUrl'] = new_url
+                    messages.append(f"Patched {package_id}: {original_url} -> {new_url}")
+
+        # Write patched manifest
+        with open(target_file, 'w') as f:
+            yaml.dump(manifest, f, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
+
+    messages.append(f"Patched manifests for {package_id}")
+    return 1, messages
+
+_worker_manager = None
+
+def _init_validate_worker(config_path, state_path):
+    """Process pool initializer: load the manager once per worker process."""
+    global _worker_manager
+    _worker_manager = WingetMirrorManager(config_path, state_path)
+
+def validate_package_hashes(package_id, algo='sha256', force=False, strict=False, file_workers=1):
+    """Validate one package's hashes in a worker started with _init_validate_worker.
+
+    Lives at module level so it can be pickled by ProcessPoolExecutor without
+    pickling the manager itself.
+    """
+    return _worker_manager.get_package(package_id).validate_hashes(algo, force, strict, file_workers)
+
+def validate_all_hashes(manager, workers=None, algo='sha256', force=False, strict=False):
+    """Validate all downloaded packages in parallel across processes.
+
+    The CPUs are shared between the processes and each package's file
+    threads: with the default one process per CPU every package is hashed
+    sequentially, and fewer processes leave room for threads within a package.
+
+    Returns:
+        dict: Mapping of package_id to the result of WingetPackage.validate_hashes().
+    """
+    package_ids = list(manager.state.get('downloads', {}))
+    cpus = os.cpu_count() or 1
+    file_workers = max(1, min(VALIDATE_FILE_WORKERS, cpus // (workers or cpus)))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_validate_worker,
+        initargs=(str(manager.config_path.resolve()), str(manager.state_path.resolve())),
+    ) as executor:
+        validate = functools.partial(validate_package_hashes, algo=algo, force=force, strict=strict, file_workers=file_workers)
+        return dict(zip(package_ids, executor.map(validate, package_ids)))
+
+def record_validation_results(manager, results, algo):
+    """Store what validate_hashes() learned in state.json.
+
+    Worker processes can't update the manager's state, so they report it back:
+    files that were just hashed and matched get a fresh 'file_stats' record,
+    mismatching files lose theirs, and files verified with SHA256 during a
+    local-algo run get their local digest stored under 'local_hashes'.
+
+    Marks the manager's state dirty when anything changed.
+
+    Returns:
+        int: Number of state entries changed.
+    """
+    changed = 0
+    for package_id, pkg_results in results.items():
+        package_info = manager.state.get('downloads', {}).get(package_id)
+        if not package_info:
+            continue
+        for filename, file_data in pkg_results.get('files', {}).items():
+            if 'local_hash' in file_data:
+                package_info.setdefault('local_hashes', {}).setdefault(algo, {})[filename] = file_data['local_hash']
+                changed += 1
+            if 'stat' in file_data:
+                package_info.setdefault('file_stats', {})[filename] = file_data['stat']
+                changed += 1
+            elif file_data['status'] == "MISMATCH" and filename in package_info.get('file_stats', {}):
+                del package_info['file_stats'][filename]
+                changed += 1
+    if changed:
+        manager.mark_dirty()
+    return changed
 
 class WingetPackage:
-    def __init__(self, manager, package_id):
+    def __init__(self, manager, package_id, pub=None, pkg=None):
         self.manager = manager
         self.package_id = package_id
-        self.pub, self.pkg = package_id.split('.', 1)
+        # Callers that already know the parts (e.g. from a directory scan) can skip the split
+        if pub is None or pkg is None:
+            pub, pkg = package_id.split('.', 1)
+        self.pub, self.pkg = pub, pkg
 
     def get_latest_version(self):
         """Get the latest version of this package from the repository."""
-        manifests_dir = self.manager.mirror_dir / 'manifests'
-        first_letter = self.pub[0].lower()
-        publisher_path = manifests_dir / first_letter / self.pub
-        package_path = publisher_path / self.pkg
-
-        if not package_path.is_dir():
-            return None
-
-        versions = [p.name for p in package_path.iterdir() if p.is_dir()]
-        valid_versions = []
-        for v in versions:
-            try:
-                parse_version_safe(v)
-                valid_versions.append(v)
-            except:
-                continue
-
-        if not valid_versions:
-            return None
-
-        return max(valid_versions, key=parse_version_safe)
+        return self.manager.latest_version(self.pub, self.pkg)
 
     def download(self):
         """Download the latest version of this package."""
         downloaded = self.manager.state.setdefault('downloads', {})
-        return process_package(self.package_id, self.manager.mirror_dir, self.manager.downloads_dir, downloaded, self.manager.repo)
-
-    def validate_hashes(self):
-        """Validate SHA256 hashes of downloaded files for this package."""
+        self.manager.mark_dirty()
+        return process_package(self.package_id, self.manager.mirror_dir, self.manager.downloads_dir, downloaded, self.manager.repo, self.manager.session, self.manager.host_limiter,
+            self.manager.config.get('parallel_downloads', self.manager.DEFAULT_CONFIG['parallel_downloads']),
+            self.manager.manifest_cache_dir, self.get_latest_version(), self.manager.hash_cache_dir)
+
+    def validate_hashes(self, algo='sha256', force=False, strict=False, file_workers=1):
+        """Validate hashes of downloaded files for this package.
+
+        Files whose size and mtime still match the 'file_stats' recorded when
+        they were last hashed are reported as CACHED without being re-read,
+        unless force or strict is set. Freshly hashed matching files return a
+        'stat' record for the caller to store.
+
+        With algo='sha256' every file is checked against its recorded SHA256.
+        With another algo ('blake2b' or 'blake3') files are checked against the
+        local digest in 'local_hashes' when one exists; otherwise they are
+        verified with SHA256 and the new local digest is returned as 'local_hash'
+        so the caller can record it. Set strict to also re-check SHA256 for
+        files that have a local digest.
+
+        Up to file_workers files are hashed at once (default: one at a time).
+        """
         package_info = self.manager.state.get('downloads', {}).get(self.package_id)
         if not package_info:
             return {"valid": False, "error": "Package not in state"}
 
         version = package_info['version']
         expected_files = package_info.get('files', {})
+        local_hashes = package_info.get('local_hashes', {}).get(algo, {}) if algo != 'sha256' else {}
+        file_stats = package_info.get('file_stats', {})
 
         results = {
             "valid": True,
@@ -438,9 +1274,12 @@ class WingetPackage:
             results["valid"] = False
             return results
 
-        actual_files = {f.name: f for f in download_dir.iterdir() if f.is_file()}
+        # Plain path strings from one directory scan; no Path object per entry
+        with os.scandir(download_dir) as it:
+            actual_files = {entry.name: entry.path for entry in it if entry.is_file()}
 
-        # Check all expected files exist and have correct hashes
+        # Check all expected files exist; those not skipped as CACHED are hashed below
+        to_hash = []
         for filename, expected_hash in expected_files.items():
             if filename not in actual_files:
                 results["missing_files"].append(filename)
@@ -448,37 +1287,86 @@ class WingetPackage:
                 continue
 
             filepath = actual_files[filename]
-            with open(filepath, 'rb') as f:
-                computed_hash = hashlib.sha256(f.read()).hexdigest()
+            cached = file_stats.get(filename)
+            if not (force or strict) and cached:
+                st = os.stat(filepath)
+                if st.st_size == cached.get('size') and st.st_mtime_ns == cached.get('mtime_ns'):
+                    results["files"][filename] = {
+                        "status": "CACHED",
+                        # The digest a re-hash with algo would be checked against
+                        "expected": local_hashes.get(filename, expected_hash),
+                        "computed": None
+                    }
+                    continue
+
+            results["files"][filename] = None  # keeps the report in state order
+            to_hash.append((filename, filepath, expected_hash))
+
+        def check(task):
+            filename, filepath, expected_hash = task
+            local_hash = None
+            if filename in local_hashes:
+                manifest_hash = expected_hash
+                expected_hash = local_hashes[filename]
+                computed_hash = file_hash(filepath, algo)
+                if strict and computed_hash == expected_hash:
+                    sha256 = sha256_file(filepath)
+                    if sha256 != manifest_hash:
+                        # Local digest agrees but the file doesn't match its SHA256: report that
+                        expected_hash, computed_hash = manifest_hash, sha256
+            else:
+                computed_hash = sha256_file(filepath)
+                if algo != 'sha256' and computed_hash == expected_hash:
+                    local_hash = file_hash(filepath, algo)
+            _drop_page_cache(filepath)
 
             match = computed_hash == expected_hash
-            status = "MATCH" if match else "MISMATCH"
-            results["files"][filename] = {
-                "status": status,
+            file_result = {
+                "status": "MATCH" if match else "MISMATCH",
                 "expected": expected_hash,
                 "computed": computed_hash
             }
+            if local_hash:
+                file_result["local_hash"] = local_hash
+            if match:
+                file_result["stat"] = file_stat_record(filepath)
+            return file_result
+
+        if file_workers > 1 and len(to_hash) > 1:
+            # Hashing releases the GIL, so a package's files can be hashed in parallel
+            with ThreadPoolExecutor(max_workers=min(file_workers, len(to_hash))) as executor:
+                checked = list(executor.map(check, to_hash))
+        else:
+            checked = [check(task) for task in to_hash]
 
-            if not match:
+        for (filename, _, _), file_result in zip(to_hash, checked):
+            results["files"][filename] = file_result
+            if file_result["status"] != "MATCH":
                 results["valid"] = False
 
         # Check for unexpected files
-        expected_filenames = set(expected_files.keys())
-        actual_filenames = set(actual_files.keys())
-        unexpected = actual_filenames - expected_filenames
+        unexpected = actual_files.keys() - expected_files.keys()
         if unexpected:
             results["unexpected_files"] = list(unexpected)
 
         return results
 
-    def purge(self):
-        """Purge downloaded files and state for this package."""
+    def remove_files(self):
+        """Remove this package's downloaded files without touching state.
+
+        Only reads state, so it is safe to run for many packages in parallel.
+
+        Returns:
+            bool: False if the package is not in state.
+        """
         package_info = self.manager.state.get('downloads', {}).get(self.package_id)
         if not package_info:
             return False
 
         version = package_info['version']
         package_dir = self.manager.downloads_dir / self.pub / self.pkg / version
+        with contextlib.suppress(OSError):
+            (self.manager.hash_cache_dir / self.pub / self.pkg / f'{version}.json').unlink()
 
         # Remove files
         if package_dir.exists():
@@ -493,30 +1381,46 @@ class WingetPackage:
                     if pub_dir.exists() and not any(pub_dir.iterdir()):
                         pub_dir.rmdir()
             except OSError:
-                pass  # Ignore if can't remove directories
+                pass  # Ignore if can't remove directories, e.g. a sibling purge got there first
+        return True
+
+    def purge(self):
+        """Purge downloaded files and state for this package."""
+        if not self.remove_files():
+            return False
 
         # Remove from state
         if self.package_id in self.manager.state.get('downloads', {}):
             del self.manager.state['downloads'][self.package_id]
-            self.manager.save_state()
+            self.manager.mark_dirty()
             return True
         return False
 
-    def get_status(self):
-        """Get the status of this package."""
+    def get_status(self, verify=False):
+        """Get the status of this package.
+
+        Uses the 'status' and 'file_count' recorded in state.json at download
+        time when present, so no disk access is needed. Pass verify=True (or
+        use a state entry from before these keys existed) to check the
+        download directory on disk instead.
+        """
         downloaded_packages = self.manager.state.get('downloads', {})
         if self.package_id in downloaded_packages:
             package_info = downloaded_packages[self.package_id]
             files = package_info.get('files', {})
             version = package_info.get('version', 'unknown')
-            timestamp = package_info.get('timestamp', 'unknown')
-            if timestamp != 'unknown' and timestamp != '-':
-                try:
-                    dt = datetime.datetime.fromisoformat(timestamp)
-                    timestamp = dt.strftime('%Y-%m-%d %H:%M')
-                except:
-                    pass
-            if files:
+            timestamp = package_info.get('timestamp_display')
+            if timestamp is None:
+                # Entries written before 'timestamp_display' existed
+                timestamp = package_info.get('timestamp') or 'unknown'
+                if timestamp != 'unknown' and timestamp != '-':
+                    try:
+                        timestamp = datetime.datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M')
+                    except ValueError:
+                        pass
+            if files and not verify and package_info.get('status') == "Downloaded" and package_info.get('file_count'):
+                status = "Downloaded"
+            elif files:
                 download_dir = self.manager.downloads_dir / self.pub / self.pkg / version
                 if download_dir.exists():
                     actual_files = list(download_dir.glob('*'))